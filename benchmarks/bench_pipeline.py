@@ -0,0 +1,191 @@
+"""
+Scalability benchmark of the training and evaluation pipeline.
+
+For each scale, a fresh interpreter generates a synthetic gk.csv-shaped wide
+CSV (35 * scale provinces) in a temporary directory and runs load_data,
+preprocess_data, train_model and evaluate_models there, with MLflow tracking
+to a local SQLite file. Per-stage wall time, CPU time, peak RSS, peak RSS
+growth over the stage start and rows come from the profile_stage records;
+end_to_end covers the four stages together.
+
+Results are written as JSON and compared against the committed baseline in
+benchmarks/baseline.json; a stage whose time or RSS growth exceeds the
+tolerance is flagged and the exit status is 1. Runs offline on CPU only:
+
+    PYTHONPATH=. python benchmarks/bench_pipeline.py                  # 1x, 10x, 100x
+    PYTHONPATH=. python benchmarks/bench_pipeline.py --scales 1 10
+    PYTHONPATH=. python benchmarks/bench_pipeline.py --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+RESULTS_PATH = os.path.join('metrics', 'benchmark_pipeline.json')
+SCALES = (1, 10, 100)
+STAGES = ('load_data', 'preprocess_data', 'train_model', 'evaluate_models')
+MEASURES = ('wall_time_s', 'cpu_time_s', 'peak_rss_bytes', 'peak_rss_delta_bytes', 'rows')
+
+# A measurement regresses when current > baseline * (1 + tolerance) + slack.
+# Memory is compared on the growth over the stage start, since the absolute
+# RSS is dominated by imported modules.
+TOLERANCES = {
+    'wall_time_s': (0.5, 0.1),
+    'peak_rss_delta_bytes': (0.25, 32 * 2**20)
+}
+
+
+def run_stages(scale, workdir):
+    """Generate the data and run the pipeline stages inside workdir"""
+    os.chdir(workdir)
+    os.environ['MLFLOW_TRACKING_URI'] = f"sqlite:///{os.path.join(workdir, 'mlflow.db')}"
+
+    import mlflow
+    from benchmarks.synthetic import make_wide_gk
+    from src.data.load_data import load_data
+    from src.features.preprocessing import preprocess_data
+    from src.models.train import train_model
+    from src.evaluation.evaluate import evaluate_models
+
+    os.makedirs('dataset', exist_ok=True)
+    make_wide_gk(scale).to_csv('dataset/gk.csv', index=False)
+    # Create the tracking database before any stage is timed
+    mlflow.search_experiments()
+
+    start = time.perf_counter()
+    load_data('dataset/gk.csv')
+    preprocess_data()
+    train_model(model_dir='models', metrics_dir='metrics')
+    evaluate_models(model_dir='models')
+    with open('end_to_end.json', 'w') as f:
+        json.dump({'wall_time_s': time.perf_counter() - start}, f)
+
+
+def run_scale(scale):
+    """Run one scale in a fresh interpreter and return its stage measurements"""
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=ROOT, GK_PROFILE='',
+                   GK_PROFILE_DIR=os.path.join(workdir, 'metrics'))
+        worker = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_pipeline', '--worker', str(scale), workdir],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if worker.returncode != 0:
+            sys.stderr.write(worker.stderr[-5000:])
+            raise RuntimeError(f"Pipeline benchmark failed at {scale}x")
+        with open(os.path.join(workdir, 'metrics', 'stage_profile.json')) as f:
+            profiles = json.load(f)
+        with open(os.path.join(workdir, 'end_to_end.json')) as f:
+            end_to_end = json.load(f)
+
+    stages = {stage: {m: profiles[stage][m] for m in MEASURES} for stage in STAGES}
+    peak_rss = max(s['peak_rss_bytes'] for s in stages.values())
+    stages['end_to_end'] = {
+        'wall_time_s': end_to_end['wall_time_s'],
+        'cpu_time_s': sum(s['cpu_time_s'] for s in stages.values()),
+        'peak_rss_bytes': peak_rss,
+        'peak_rss_delta_bytes': peak_rss - profiles['load_data']['rss_start_bytes'],
+        'rows': stages['load_data']['rows']
+    }
+    return stages
+
+
+def environment():
+    import numpy
+    import pandas
+    import sklearn
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'scikit-learn': sklearn.__version__
+    }
+
+
+def compare(results, baseline):
+    """Return (scale, stage, measure, current, baseline) for each regression"""
+    regressions = []
+    for scale, stages in results['scales'].items():
+        base_stages = baseline.get('scales', {}).get(scale, {})
+        for stage, measures in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            for measure, (tolerance, slack) in TOLERANCES.items():
+                if measures[measure] > base[measure] * (1 + tolerance) + slack:
+                    regressions.append((scale, stage, measure, measures[measure], base[measure]))
+    return regressions
+
+
+def _ratio(current, base):
+    return f"{current / base:.2f}x" if base else '-'
+
+
+def report(results, baseline):
+    print(f"{'scale':>5} {'stage':<16} {'rows':>9} {'wall s':>9} {'vs base':>8} "
+          f"{'cpu s':>9} {'peak MB':>9} {'+MB':>9} {'vs base':>8}")
+    for scale, stages in results['scales'].items():
+        base_stages = baseline.get('scales', {}).get(scale, {})
+        for stage, m in stages.items():
+            base = base_stages.get(stage, {})
+            wall_ratio = _ratio(m['wall_time_s'], base.get('wall_time_s'))
+            rss_ratio = _ratio(m['peak_rss_delta_bytes'], base.get('peak_rss_delta_bytes'))
+            print(f"{scale:>4}x {stage:<16} {m['rows'] or 0:>9} {m['wall_time_s']:>9.3f} {wall_ratio:>8} "
+                  f"{m['cpu_time_s']:>9.3f} {m['peak_rss_bytes'] / 2**20:>9.1f} "
+                  f"{m['peak_rss_delta_bytes'] / 2**20:>9.1f} {rss_ratio:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results to the baseline instead of comparing')
+    parser.add_argument('--worker', nargs=2, metavar=('SCALE', 'WORKDIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_stages(int(args.worker[0]), args.worker[1])
+        return 0
+
+    results = {'environment': environment(), 'scales': {}}
+    for scale in args.scales:
+        print(f"Running {scale}x...", flush=True)
+        results['scales'][str(scale)] = run_scale(scale)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=4)
+        report(results, {})
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except OSError:
+        baseline = {}
+    report(results, baseline)
+
+    regressions = compare(results, baseline)
+    for scale, stage, measure, current, base in regressions:
+        print(f"REGRESSION {scale}x {stage} {measure}: {current:.3f} vs baseline {base:.3f}")
+    print(f"Results written to {args.output}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Peak memory and runtime of the default and compact preprocessing paths.
+
+Writes synthetic long-format GK data at 1x, 10x and 100x scale, then for each
+path reads it the way preprocess_data does and runs transform_features. Peak
+memory is the tracemalloc peak of read + transform. Run with:
+
+    PYTHONPATH=. python benchmarks/bench_preprocessing.py
+"""
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_long_gk
+from src.features.preprocessing import COMPACT_DTYPES, transform_features
+
+SCALES = (1, 10, 100)
+
+
+def run(path, compact):
+    """Return (seconds, peak bytes, output) for reading and transforming the CSV"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    if compact:
+        df = pd.read_csv(path, usecols=list(COMPACT_DTYPES), dtype=COMPACT_DTYPES)
+    else:
+        df = pd.read_csv(path)
+    X, y, _ = transform_features(df, compact=compact)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, (X, y.to_numpy())
+
+
+def main(scales=SCALES):
+    # The default path logs a NaN table per call
+    logging.getLogger('src.features.preprocessing').setLevel(logging.WARNING)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            path = os.path.join(tmp, f"dataset_{scale}x.csv")
+            make_long_gk(scale).to_csv(path, index=False)
+            data_mb = os.path.getsize(path) / 2**20
+
+            default_s, default_peak, (X, y) = run(path, compact=False)
+            compact_s, compact_peak, (X_c, y_c) = run(path, compact=True)
+            assert np.allclose(X, X_c, rtol=1e-6, atol=1e-6) and np.array_equal(y, y_c)
+
+            results.append({
+                "scale": scale,
+                "rows": len(y),
+                "csv_mb": data_mb,
+                "default_s": default_s,
+                "compact_s": compact_s,
+                "default_peak_mb": default_peak / 2**20,
+                "compact_peak_mb": compact_peak / 2**20
+            })
+
+    print(f"{'scale':>5} {'rows':>9} {'csv MB':>7} {'default s':>10} {'compact s':>10} "
+          f"{'default MB':>11} {'compact MB':>11}")
+    for r in results:
+        print(f"{r['scale']:>4}x {r['rows']:>9} {r['csv_mb']:>7.1f} {r['default_s']:>10.3f} "
+              f"{r['compact_s']:>10.3f} {r['default_peak_mb']:>11.1f} {r['compact_peak_mb']:>11.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Synthetic Garis Kemiskinan data at a chosen scale, for benchmarks."""
+import numpy as np
+import pandas as pd
+
+JENIS = ['MAKANAN', 'NONMAKANAN', 'TOTAL']
+DAERAH = ['PERKOTAAN', 'PERDESAAN', 'PERDESAANPERKOTAAN']
+PERIODE = ['MARET', 'SEPTEMBER']
+N_PROVINCES = 35
+YEARS = list(range(2013, 2023))
+
+
+def make_long_gk(scale=1, seed=42):
+    """
+    Long-format GK data shaped like data/raw/dataset.csv.
+
+    ``scale`` multiplies the number of provinces, giving
+    35 * scale * 180 rows (about 6.3k rows at scale 1).
+    """
+    rng = np.random.default_rng(seed)
+    provinces = [f"PROVINSI {i}" for i in range(N_PROVINCES * scale)]
+    index = pd.MultiIndex.from_product(
+        [JENIS, DAERAH, YEARS, PERIODE, provinces],
+        names=['jenis', 'daerah', 'tahun', 'periode', 'provinsi']
+    )
+    df = index.to_frame(index=False)
+    df['category'] = (
+        'gk.' + df['jenis'].str.lower() + '.' + df['daerah'].str.lower() + '.'
+        + df['tahun'].astype(str) + '.' + df['periode'].str.lower()
+    )
+    df['nilai'] = rng.uniform(2e5, 7e5, len(df)).round()
+    # A few cells are missing, as in the published data
+    df.loc[rng.random(len(df)) < 0.02, 'nilai'] = np.nan
+    return df[['provinsi', 'category', 'nilai', 'jenis', 'daerah', 'tahun', 'periode']]
+
+
+# Years published per jenis in dataset/gk.csv
+WIDE_YEARS = {
+    'makanan': range(2015, 2023),
+    'nonmakanan': range(2015, 2023),
+    'total': range(2013, 2023)
+}
+
+
+def make_wide_gk(scale=1, seed=42):
+    """
+    Wide GK data shaped like dataset/gk.csv: one row per province and one
+    gk.<jenis>.<daerah>.<tahun>.<periode> column per published value.
+
+    ``scale`` multiplies the number of provinces (35 at scale 1).
+    """
+    rng = np.random.default_rng(seed)
+    provinces = [f"PROVINSI {i}" for i in range(N_PROVINCES * scale)]
+    columns = {'provinsi': provinces}
+    for jenis, years in WIDE_YEARS.items():
+        for daerah in DAERAH:
+            for tahun in years:
+                for periode in PERIODE:
+                    name = f"gk.{jenis.lower()}.{daerah.lower()}.{tahun}.{periode.lower()}"
+                    values = rng.uniform(2e5, 7e5, len(provinces)).round()
+                    values[rng.random(len(provinces)) < 0.02] = np.nan
+                    columns[name] = values
+    return pd.DataFrame(columns)
@@ -1,6 +1,8 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+from flask import Flask, Response, request, jsonify
+from src.api.schema import SchemaError, compile_schema, parse_interval, dumps
+from src.models.intervals import as_compact_forest, predict_interval
 import pickle
+import threading
 import os
 import logging
 import json
@@ -13,12 +15,18 @@ app = Flask(__name__)
 
 # Load the model and metrics
 try:
-    # Load best model (tuned model)
-    model_path = os.path.join(os.path.dirname(__file__), '..', 'models', 'tuned_model.pkl')
+    # Load best model (tuned model), or e.g. compact_model.pkl via MODEL_PATH
+    model_path = os.environ.get(
+        'MODEL_PATH',
+        os.path.join(os.path.dirname(__file__), '..', 'models', 'tuned_model.pkl')
+    )
     logger.info(f"Loading model from {model_path}")
     with open(model_path, 'rb') as f:
         model = pickle.load(f)
     
+    # Compile the feature schema once, in the model's column order
+    feature_schema = compile_schema(model)
+    
     # Load model metrics
     metrics_path = os.path.join(os.path.dirname(__file__), '..', 'metrics', 'all_metrics.json')
     with open(metrics_path, 'rb') as f:
@@ -28,6 +36,25 @@ except Exception as e:
     logger.error(f"Error loading model or metrics: {str(e)}")
     model = None
     model_metrics = None
+    feature_schema = None
+
+# Packed copy of the forest used for per-tree prediction intervals, built on
+# the first interval request so replicas that never serve one hold one model
+forest = None
+forest_lock = threading.Lock()
+
+def get_forest():
+    """Return the packed forest for intervals, or None for non-forest models"""
+    global forest
+    if forest is None:
+        with forest_lock:
+            if forest is None:
+                forest = as_compact_forest(model)
+    return forest
+
+def json_response(payload, status=200):
+    """Serialize a response body with the fast JSON encoder"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
 
 @app.route('/health')
 def health():
@@ -54,6 +81,11 @@ def predict():
             "daerah_PERKOTAAN": 1
         }
     }
+    Optional query parameters ``interval`` ("quantile" or "std") and
+    ``level`` (default 0.9) add bounds from the spread of the per-tree outputs.
+    The bounds show how much the trees disagree and are not a coverage
+    guarantee: on held-out data far fewer than ``level`` of the targets fall
+    inside them.
     """
     if model is None:
         return jsonify({
@@ -62,31 +94,38 @@ def predict():
         }), 503
     
     try:
-        # Get input data
-        data = request.get_json()
-        if not data or 'features' not in data:
-            return jsonify({
-                "error": "Invalid input format. Expected 'features' object in request",
-                "status": "error"
-            }), 400
-        
-        # Validate features
-        required_features = ['year_num', 'periode_num', 'jenis_NONMAKANAN', 'jenis_TOTAL', 
-                           'daerah_PERDESAANPERKOTAAN', 'daerah_PERKOTAAN']
-        missing_features = [f for f in required_features if f not in data['features']]
-        if missing_features:
-            return jsonify({
-                "error": f"Missing required features: {missing_features}",
-                "status": "error"
-            }), 400
-        
-        # Convert to DataFrame
-        features = pd.DataFrame([data['features']])
+        # Validate input straight into the model's feature row
+        features = feature_schema.parse(request.get_data(cache=False))
+        interval, level = parse_interval(request.args)
+        forest = get_forest() if interval is not None else None
+        if interval is not None and forest is None:
+            raise SchemaError("Prediction intervals require a tree ensemble model")
+    except SchemaError as e:
+        return json_response({
+            "error": str(e),
+            "status": "error"
+        }, 400)
+    
+    try:
+        if interval is not None:
+            # Point prediction and bounds share one pass over all trees
+            prediction, lower, upper = predict_interval(forest, features, interval, level)
+            return json_response({
+                "prediction": float(prediction[0]),
+                "interval": {
+                    "type": interval,
+                    "level": level,
+                    "calibrated": False,
+                    "lower": float(lower[0]),
+                    "upper": float(upper[0])
+                },
+                "status": "success"
+            })
         
         # Make prediction
         prediction = model.predict(features)
         
-        return jsonify({
+        return json_response({
             "prediction": float(prediction[0]),
             "status": "success"
         })
@@ -110,8 +149,7 @@ def metadata():
     return jsonify({
         "model_type": "Random Forest Regressor (Tuned)",
         "metrics": model_metrics.get('tuned', {}),
-        "features": ['year_num', 'periode_num', 'jenis_NONMAKANAN', 'jenis_TOTAL', 
-                    'daerah_PERDESAANPERKOTAAN', 'daerah_PERKOTAAN'],
+        "features": list(feature_schema.names),
         "status": "success"
     })
 
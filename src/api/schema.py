@@ -0,0 +1,149 @@
+import numpy as np
+import threading
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Model features with their allowed (min, max) range
+FEATURE_RANGES = {
+    'year_num': (0, 100),
+    'periode_num': (0, 1),
+    'jenis_NONMAKANAN': (0, 1),
+    'jenis_TOTAL': (0, 1),
+    'daerah_PERDESAANPERKOTAAN': (0, 1),
+    'daerah_PERKOTAAN': (0, 1)
+}
+
+# 0/1 indicator features, which take no values in between
+INDICATOR_FEATURES = frozenset({
+    'periode_num',
+    'jenis_NONMAKANAN',
+    'jenis_TOTAL',
+    'daerah_PERDESAANPERKOTAAN',
+    'daerah_PERKOTAAN'
+})
+
+# Prediction interval types served by /predict and src.models.intervals
+INTERVAL_TYPES = ("quantile", "std")
+
+
+class SchemaError(ValueError):
+    """Raised when a request body does not match the feature schema"""
+
+
+def loads(data):
+    """Decode JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """Encode an object to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+class FeatureSchema:
+    """
+    Feature schema compiled once at startup.
+
+    Holds the feature names in model column order and their ranges, and
+    validates request bodies straight into a per-thread preallocated row.
+    """
+
+    def __init__(self, names, ranges=FEATURE_RANGES, indicators=INDICATOR_FEATURES):
+        self.names = tuple(str(name) for name in names)
+        unknown = [name for name in self.names if name not in ranges]
+        if unknown:
+            raise ValueError(f"No range defined for model features: {unknown}")
+        self.bounds = tuple(ranges[name] for name in self.names)
+        self._checks = tuple(
+            (i, name, bounds, name in indicators)
+            for i, (name, bounds) in enumerate(zip(self.names, self.bounds))
+        )
+        self._known = frozenset(self.names)
+        self._local = threading.local()
+
+    def _row(self):
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.names)), dtype=np.float64)
+        return row
+
+    def parse(self, body):
+        """
+        Validate a request body and return the feature row.
+
+        Args:
+            body (bytes): Raw JSON body of the form {"features": {...}}
+
+        Returns:
+            np.ndarray: Row of shape (1, n_features), reused by the calling thread
+        """
+        try:
+            data = loads(body)
+        except ValueError as e:
+            raise SchemaError(f"Invalid JSON: {e}")
+        if not isinstance(data, dict) or not isinstance(data.get('features'), dict):
+            raise SchemaError("Invalid input format. Expected 'features' object in request")
+        features = data['features']
+
+        missing = [name for name in self.names if name not in features]
+        if missing:
+            raise SchemaError(f"Missing required features: {missing}")
+        if len(features) != len(self.names):
+            unknown = [name for name in features if name not in self._known]
+            raise SchemaError(f"Unknown features: {unknown}")
+
+        row = self._row()
+        out = row[0]
+        for i, name, (low, high), indicator in self._checks:
+            value = features[name]
+            # bool is a subclass of int but is not a valid feature value
+            if type(value) not in (int, float):
+                raise SchemaError(
+                    f"Feature '{name}' must be a number, got {type(value).__name__}"
+                )
+            if indicator:
+                if value != 0 and value != 1:
+                    raise SchemaError(f"Feature '{name}' must be 0 or 1, got {value}")
+            elif not low <= value <= high:
+                raise SchemaError(
+                    f"Feature '{name}' must be between {low} and {high}, got {value}"
+                )
+            out[i] = value
+        return row
+
+
+def parse_interval(args):
+    """
+    Read the optional interval options from the query string.
+
+    Returns:
+        tuple: (interval, level), or (None, None) when no interval is requested
+    """
+    interval = args.get('interval')
+    if interval is None:
+        return None, None
+    if interval not in INTERVAL_TYPES:
+        raise SchemaError(f"interval must be one of {list(INTERVAL_TYPES)}, got {interval}")
+    try:
+        level = float(args.get('level', 0.9))
+    except ValueError:
+        raise SchemaError(f"level must be a number, got {args.get('level')}")
+    if not 0 < level < 1:
+        raise SchemaError(f"level must be between 0 and 1, got {level}")
+    return interval, level
+
+
+def compile_schema(model=None):
+    """Build the feature schema, following the model's column order when it has one"""
+    names = getattr(model, 'feature_names_in_', None)
+    if names is None:
+        names = list(FEATURE_RANGES)
+    return FeatureSchema(names)
@@ -1,8 +1,10 @@
 import pandas as pd
 import mlflow
 import os
+from src.profiling.profiler import profile_stage
 
-def load_data():
+@profile_stage("load_data")
+def load_data(path="dataset/gk.csv"):
     """
     Load Garis Kemiskinan (GK) dataset.
     Returns a pandas DataFrame with features and target.
@@ -10,7 +12,7 @@ def load_data():
     # Start MLflow run
     with mlflow.start_run(run_name="data_loading"):
         # Load dataset
-        df = pd.read_csv("dataset/gk.csv")
+        df = pd.read_csv(path)
         
         # Melt the dataframe to get the expected format
         id_vars = ['provinsi']
@@ -18,8 +20,12 @@ def load_data():
         
         df_melted = pd.melt(df, id_vars=id_vars, value_vars=value_vars, var_name='category', value_name='nilai')
         
-        # Extract components from category column
-        df_melted[['jenis', 'daerah', 'tahun', 'periode']] = df_melted['category'].str.extract(r'nilai\.(\w+)\.(\w+)\.(\d+)\.(\w+)')
+        # Extract components from category column, e.g. gk.makanan.perkotaan.2015.maret
+        df_melted[['jenis', 'daerah', 'tahun', 'periode']] = df_melted['category'].str.extract(r'^\w+\.(\w+)\.(\w+)\.(\d+)\.(\w+)$')
+        
+        # Match the upper-case values of the published long-format data
+        for col in ['jenis', 'daerah', 'periode']:
+            df_melted[col] = df_melted[col].str.upper()
         
         # Convert tahun to numeric
         df_melted['tahun'] = pd.to_numeric(df_melted['tahun'])
@@ -55,7 +61,7 @@ def preprocess_data(df):
     df['periode_num'] = (df['periode'] == 'SEPTEMBER').astype(int)
     
     # Create dummy variables for categorical columns
-    df_encoded = pd.get_dummies(df, columns=['jenis', 'daerah'], drop_first=False)
+    df_encoded = pd.get_dummies(df, columns=['jenis', 'daerah'], drop_first=False, dtype=int)
     
     # Select features and target
     features = ['year_num', 'periode_num'] + [col for col in df_encoded.columns if col.startswith(('jenis_', 'daerah_'))]
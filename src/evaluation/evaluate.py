@@ -6,6 +6,8 @@ import pickle
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import os
 import logging
+from src.models.intervals import as_compact_forest, predict_interval
+from src.profiling.profiler import profile_stage, record_rows
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,10 +22,20 @@ def load_model(model_path):
         logger.error(f"Error loading model from {model_path}: {str(e)}")
         return None
 
-def evaluate_single_model(model, model_name, X, y):
-    """Evaluate a single model and return metrics"""
+def evaluate_single_model(model, model_name, X, y, interval=None, level=0.9):
+    """
+    Evaluate a single model and return metrics.
+
+    With ``interval`` ("quantile" or "std") tree ensembles also report the
+    measured coverage and mean width of their per-tree spread intervals at
+    ``level``.
+    """
     # Make predictions
-    predictions = model.predict(X)
+    forest = as_compact_forest(model) if interval is not None else None
+    if forest is not None:
+        predictions, lower, upper = predict_interval(forest, X, interval, level)
+    else:
+        predictions = model.predict(X)
     
     # Calculate metrics
     valid_indices = ~np.isnan(y)  # Get indices where target is not NaN
@@ -31,6 +43,8 @@ def evaluate_single_model(model, model_name, X, y):
         logger.warning(f"Found {np.sum(~valid_indices)} NaN values in target data")
         y = y[valid_indices]
         predictions = predictions[valid_indices]
+        if forest is not None:
+            lower, upper = lower[valid_indices], upper[valid_indices]
     
     metrics = {
         "mse": mean_squared_error(y, predictions),
@@ -42,6 +56,11 @@ def evaluate_single_model(model, model_name, X, y):
     # Add percentage error
     metrics["mape"] = np.mean(np.abs((y - predictions) / y)) * 100
     
+    # Add the share of targets inside the interval, which can be well below level
+    if forest is not None:
+        metrics["interval_coverage"] = np.mean((y >= lower) & (y <= upper))
+        metrics["interval_width"] = np.mean(upper - lower)
+    
     # Create feature importance if available
     if hasattr(model, 'feature_importances_'):
         feature_importance = pd.DataFrame({
@@ -56,16 +75,22 @@ def evaluate_single_model(model, model_name, X, y):
     
     return metrics, predictions
 
-def evaluate_models():
+@profile_stage("evaluate_models")
+def evaluate_models(model_dir=None):
     """
     Evaluate all trained models and compare their performance.
     Returns a dictionary of metrics for each model.
+
+    Models are read from ``model_dir``, by default where train_model saves them.
     """
+    if model_dir is None:
+        model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+    
     with mlflow.start_run(run_name="model_evaluation"):
         logger.info("Loading data...")
         # Load data
         X = pd.read_csv("data/processed/features.csv")
-        y = pd.read_csv("data/processed/target.csv")['gk'].values
+        y = pd.read_csv("data/processed/target.csv")['nilai'].values
         
         # Handle missing values in features and target
         logger.info("Checking for missing values...")
@@ -78,6 +103,7 @@ def evaluate_models():
             y = pd.Series(y).fillna(pd.Series(y).mean()).values
         
         logger.info(f"Data loaded - X shape: {X.shape}, y shape: {y.shape}")
+        record_rows(len(X))
         
         # Model names to evaluate
         model_names = ["default", "custom", "tuned"]
@@ -86,14 +112,14 @@ def evaluate_models():
         
         # Evaluate each model
         for model_name in model_names:
-            model_path = f"models/{model_name}_model.pkl"
+            model_path = os.path.join(model_dir, f"{model_name}_model.pkl")
             logger.info(f"Evaluating {model_name} model...")
             
             model = load_model(model_path)
             if model is None:
                 continue
                 
-            metrics, predictions = evaluate_single_model(model, model_name, X, y)
+            metrics, predictions = evaluate_single_model(model, model_name, X, y, interval="quantile")
             all_metrics[model_name] = metrics
             all_predictions[model_name] = predictions
             
@@ -4,79 +4,188 @@ import mlflow
 from sklearn.preprocessing import StandardScaler
 import os
 import logging
+from src.profiling.profiler import profile_stage
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def preprocess_data(df=None):
+# Set to "1" to use the memory-compact preprocessing path by default
+COMPACT_ENV = "GK_COMPACT_PREPROCESSING"
+
+# Columns and dtypes read from data/raw/dataset.csv in compact mode
+COMPACT_DTYPES = {
+    'jenis': 'category',
+    'daerah': 'category',
+    'periode': 'category',
+    'tahun': 'float32',
+    'nilai': 'float64'
+}
+
+
+def _transform(df):
+    """Current preprocessing path: object strings and float64 features"""
+    # Log initial NaN counts
+    logger.info(f"Initial NaN counts:\n{df.isna().sum()}")
+
+    # Create numerical features
+    df['year_num'] = df['tahun'] - df['tahun'].min()
+    df['periode_num'] = (df['periode'] == 'SEPTEMBER').astype(int)
+
+    # Create dummy variables for categorical columns
+    df = pd.get_dummies(df, columns=['jenis', 'daerah'], drop_first=True)
+
+    # Separate features and target
+    features = ['year_num', 'periode_num'] + [col for col in df.columns if col.startswith(('jenis_', 'daerah_'))]
+    X = df[features].copy()
+    y = df['nilai'].copy()
+
+    logger.info(f"Features selected: {features}")
+    logger.info(f"X shape: {X.shape}, y shape: {y.shape}")
+
+    # Handle missing values
+    X = X.fillna(X.mean())  # Fill missing values in features with mean
+    y = y.fillna(y.mean())  # Fill missing values in target with mean
+
+    # Verify no NaNs remain
+    if X.isna().any().any():
+        logger.error("NaN values remain in features after filling!")
+        raise ValueError("Failed to handle all NaN values in features")
+    if y.isna().any():
+        logger.error("NaN values remain in target after filling!")
+        raise ValueError("Failed to handle all NaN values in target")
+
+    logger.info("Successfully handled missing values")
+
+    # Scale features
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    return X_scaled, y, features
+
+
+def _transform_compact(df):
+    """
+    Memory-compact preprocessing path.
+
+    String keys are categorical, one-hot columns are uint8 and features are
+    float32. The input frame is not modified and the features are written
+    once into a single float32 array that is scaled in place.
+    """
+    # Log initial NaN counts, one column at a time
+    logger.info(f"Initial NaN counts: { {col: int(df[col].isna().sum()) for col in df.columns} }")
+
+    keys = {}
+    for col in ('jenis', 'daerah'):
+        key = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype('category')
+        # Sorted categories drop the same first column as get_dummies on strings;
+        # read_csv can return them in order of appearance
+        key = key.cat.set_categories(sorted(key.cat.categories))
+        keys[col] = pd.get_dummies(key, prefix=col, drop_first=True, dtype=np.uint8)
+
+    features = ['year_num', 'periode_num'] + [c for dummies in keys.values() for c in dummies.columns]
+    logger.info(f"Features selected: {features}")
+
+    X_scaled = np.empty((len(df), len(features)), dtype=np.float32)
+
+    # Create numerical features, filling missing years with the mean
+    tahun = df['tahun'].to_numpy(dtype=np.float32)
+    np.subtract(tahun, np.nanmin(tahun) if len(tahun) else 0, out=X_scaled[:, 0])
+    if np.isnan(X_scaled[:, 0]).any():
+        X_scaled[:, 0] = np.nan_to_num(X_scaled[:, 0], nan=np.nanmean(X_scaled[:, 0], dtype=np.float64))
+    X_scaled[:, 1] = (df['periode'] == 'SEPTEMBER').to_numpy()
+
+    # Copy one-hot columns in
+    i = 2
+    for dummies in keys.values():
+        for col in dummies.columns:
+            X_scaled[:, i] = dummies[col].to_numpy()
+            i += 1
+
+    y = df['nilai'].astype(np.float64)
+    y = y.fillna(y.mean())
+
+    logger.info(f"X shape: {X_scaled.shape}, y shape: {y.shape}")
+
+    # Verify no NaNs remain
+    if np.isnan(X_scaled).any():
+        logger.error("NaN values remain in features after filling!")
+        raise ValueError("Failed to handle all NaN values in features")
+    if y.isna().any():
+        logger.error("NaN values remain in target after filling!")
+        raise ValueError("Failed to handle all NaN values in target")
+
+    logger.info("Successfully handled missing values")
+
+    # Scale features in place
+    scaler = StandardScaler(copy=False)
+    X_scaled = scaler.fit_transform(X_scaled)
+
+    return X_scaled, y, features
+
+
+def transform_features(df, compact=False):
+    """
+    Create scaled model features and the target from the long-format GK data.
+
+    Args:
+        df (pd.DataFrame): Data with jenis, daerah, tahun, periode and nilai columns
+        compact (bool): Use the memory-compact path, whose float32 output matches
+            the default path to float32 precision
+
+    Returns:
+        tuple: (X_scaled, y, features)
+    """
+    if compact:
+        return _transform_compact(df)
+    return _transform(df)
+
+
+@profile_stage("preprocess_data")
+def preprocess_data(df=None, compact=None):
     """
     Preprocess the Garis Kemiskinan data by handling missing values and scaling numerical features.
     Returns scaled features and target (nilai values).
+
+    With ``compact`` (default from GK_COMPACT_PREPROCESSING) the memory-compact
+    path is used, see transform_features.
     """
+    if compact is None:
+        compact = os.environ.get(COMPACT_ENV) == "1"
+
     with mlflow.start_run(run_name="preprocessing"):
         # Load data if not provided
         if df is None:
-            df = pd.read_csv("data/raw/dataset.csv")
+            if compact:
+                df = pd.read_csv("data/raw/dataset.csv", usecols=list(COMPACT_DTYPES), dtype=COMPACT_DTYPES)
+            else:
+                df = pd.read_csv("data/raw/dataset.csv")
             logger.info(f"Loaded dataset with shape: {df.shape}")
-        
-        # Log initial NaN counts
-        logger.info(f"Initial NaN counts:\n{df.isna().sum()}")
-        
-        # Create numerical features
-        df['year_num'] = df['tahun'] - df['tahun'].min()
-        df['periode_num'] = (df['periode'] == 'SEPTEMBER').astype(int)
-        
-        # Create dummy variables for categorical columns
-        df = pd.get_dummies(df, columns=['jenis', 'daerah'], drop_first=True)
-        
-        # Separate features and target
-        features = ['year_num', 'periode_num'] + [col for col in df.columns if col.startswith(('jenis_', 'daerah_'))]
-        X = df[features].copy()
-        y = df['nilai'].copy()
-        
-        logger.info(f"Features selected: {features}")
-        logger.info(f"X shape: {X.shape}, y shape: {y.shape}")
-        
-        # Handle missing values
-        X = X.fillna(X.mean())  # Fill missing values in features with mean
-        y = y.fillna(y.mean())  # Fill missing values in target with mean
-        
-        # Verify no NaNs remain
-        if X.isna().any().any():
-            logger.error("NaN values remain in features after filling!")
-            raise ValueError("Failed to handle all NaN values in features")
-        if y.isna().any():
-            logger.error("NaN values remain in target after filling!")
-            raise ValueError("Failed to handle all NaN values in target")
-            
-        logger.info("Successfully handled missing values")
-        
-        # Scale features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
+
+        X_scaled, y, features = transform_features(df, compact=compact)
+
         # Log preprocessing params
         mlflow.log_param("scaler", "StandardScaler")
-        mlflow.log_param("n_features", X.shape[1])
+        mlflow.log_param("n_features", len(features))
         mlflow.log_param("features", features)
-        
+        mlflow.log_param("compact", compact)
+
         # Create processed data directory
         os.makedirs("data/processed", exist_ok=True)
-        
+
         # Save processed data
-        X_df = pd.DataFrame(X_scaled, columns=X.columns)
+        X_df = pd.DataFrame(X_scaled, columns=features, copy=False)
         y_df = pd.DataFrame({'nilai': y})
-        
+
         # Final verification
         logger.info(f"Final X shape: {X_df.shape}, Final y shape: {y_df.shape}")
         logger.info(f"Any NaNs in X: {X_df.isna().any().any()}")
         logger.info(f"Any NaNs in y: {y_df.isna().any().any()}")
-        
+
         X_df.to_csv("data/processed/features.csv", index=False)
         y_df.to_csv("data/processed/target.csv", index=False)
-        
+
         return X_scaled, y.values
 
 if __name__ == "__main__":
-    preprocess_data() 
\ No newline at end of file
+    preprocess_data()
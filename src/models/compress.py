@@ -0,0 +1,468 @@
+import pandas as pd
+import numpy as np
+import mlflow
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import r2_score
+import pickle
+import subprocess
+import tempfile
+import time
+import sys
+import os
+import json
+import logging
+from src.profiling.profiler import profile_stage, record_rows
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VALUE_DTYPES = ("float64", "float32", "uint16", "uint8")
+THRESHOLD_DTYPES = ("float64", "float32", "uint16")
+
+
+class CompactForest:
+    """
+    Flattened, array-packed copy of a fitted random forest regressor.
+
+    All trees share one set of node arrays. The two children of an internal
+    node are stored next to each other, so only the left child index is kept
+    and the right child is ``left + 1``. Leaves point at themselves with an
+    infinite threshold, which lets every tree be walked for a fixed number of
+    steps in a single vectorized loop.
+    """
+
+    def __init__(self, roots, feature, left, thresholds, values, depth,
+                 n_features_in, threshold_table=None, value_scale=None,
+                 value_offset=None):
+        self.roots = roots
+        self.feature = feature
+        self.left = left
+        self.thresholds = thresholds
+        self.values = values
+        self.depth = depth
+        self.n_features_in_ = n_features_in
+        self.threshold_table = threshold_table
+        self.value_scale = value_scale
+        self.value_offset = value_offset
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def node_count(self):
+        return len(self.left)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the node arrays"""
+        arrays = [self.roots, self.feature, self.left, self.thresholds, self.values]
+        if self.threshold_table is not None:
+            arrays.append(self.threshold_table)
+        return int(sum(a.nbytes for a in arrays))
+
+    def apply(self, X):
+        """Return the leaf node index reached in every tree, shape (n_samples, n_trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        idx = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.depth):
+            thresholds = self.thresholds[idx]
+            if self.threshold_table is not None:
+                thresholds = self.threshold_table[thresholds]
+            idx = self.left[idx] + (X[rows, self.feature[idx]] > thresholds)
+        return idx
+
+    def leaf_values(self, idx):
+        """Decode the stored values of the given node indices to float64"""
+        values = self.values[idx].astype(np.float64)
+        if self.value_scale is not None:
+            values = values * self.value_scale + self.value_offset
+        return values
+
+    def predict(self, X, batch_size=4096):
+        """Predict the forest mean for each row of X"""
+        X = np.asarray(X, dtype=np.float32)
+        return np.concatenate([
+            self.leaf_values(self.apply(X[start:start + batch_size])).mean(axis=1)
+            for start in range(0, max(len(X), 1), batch_size)
+        ])
+
+
+def _smallest_uint(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _float32_floor(thresholds):
+    """
+    Round float64 thresholds down to float32.
+
+    Trees compare float32 inputs against float64 thresholds, so using the
+    largest float32 not above each threshold keeps every split decision.
+    """
+    thresholds32 = thresholds.astype(np.float32)
+    above = thresholds32.astype(np.float64) > thresholds
+    thresholds32[above] = np.nextafter(thresholds32[above], np.float32(-np.inf))
+    return thresholds32
+
+
+def _prune_tree(tree, max_depth=None, merge_tol=0.0):
+    """
+    Return per-node leaf flags and depths of a fitted sklearn tree after pruning.
+
+    Nodes below ``max_depth`` are cut and their parent becomes a leaf that
+    predicts the parent's mean. Sibling leaves whose values differ by at most
+    ``merge_tol`` relative to their parent are merged into the parent.
+    """
+    children_left = tree.children_left
+    children_right = tree.children_right
+    values = tree.value[:, 0, 0]
+
+    is_leaf = children_left == -1
+    depth = np.zeros(tree.node_count, dtype=np.int64)
+    order = []
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if children_left[node] != -1:
+            for child in (children_left[node], children_right[node]):
+                depth[child] = depth[node] + 1
+                stack.append(child)
+
+    if max_depth is not None:
+        is_leaf = is_leaf | (depth >= max_depth)
+
+    if merge_tol > 0:
+        is_leaf = is_leaf.copy()
+        # Children are visited after their parent, so walking the order
+        # backwards merges bottom-up
+        for node in reversed(order):
+            if is_leaf[node]:
+                continue
+            left, right = children_left[node], children_right[node]
+            if is_leaf[left] and is_leaf[right]:
+                spread = abs(values[left] - values[right])
+                if spread <= merge_tol * abs(values[node]):
+                    is_leaf[node] = True
+
+    return is_leaf, depth
+
+
+def build_compact_forest(model, n_estimators=None, max_depth=None, merge_tol=0.0,
+                         threshold_dtype="float32", value_dtype="float32"):
+    """
+    Pack a fitted RandomForestRegressor into a CompactForest.
+
+    Args:
+        model: Fitted RandomForestRegressor
+        n_estimators (int): Number of trees to keep (the first n), all if None
+        max_depth (int): Depth cap applied to every tree, none if None
+        merge_tol (float): Relative tolerance for merging sibling leaves
+        threshold_dtype (str): One of THRESHOLD_DTYPES
+        value_dtype (str): One of VALUE_DTYPES
+
+    Returns:
+        CompactForest: Packed forest
+    """
+    if threshold_dtype not in THRESHOLD_DTYPES:
+        raise ValueError(f"threshold_dtype must be one of {THRESHOLD_DTYPES}")
+    if value_dtype not in VALUE_DTYPES:
+        raise ValueError(f"value_dtype must be one of {VALUE_DTYPES}")
+
+    estimators = model.estimators_[:n_estimators]
+    roots, features, lefts, thresholds, values = [], [], [], [], []
+    forest_depth = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        is_leaf, depth = _prune_tree(tree, max_depth, merge_tol)
+        base = len(lefts)
+        roots.append(base)
+
+        # Lay out nodes breadth-first so siblings sit next to each other
+        queue = [0]
+        lefts.append(None)
+        features.append(0)
+        thresholds.append(np.inf)
+        values.append(tree.value[0, 0, 0])
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            slot = base + head
+            head += 1
+            if is_leaf[node]:
+                lefts[slot] = slot
+                features[slot] = 0
+                thresholds[slot] = np.inf
+                forest_depth = max(forest_depth, int(depth[node]))
+                continue
+            lefts[slot] = len(lefts)
+            features[slot] = tree.feature[node]
+            thresholds[slot] = tree.threshold[node]
+            for child in (tree.children_left[node], tree.children_right[node]):
+                queue.append(child)
+                lefts.append(None)
+                features.append(0)
+                thresholds.append(np.inf)
+                values.append(tree.value[child, 0, 0])
+
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    threshold_table = None
+    if threshold_dtype == "float64":
+        packed_thresholds = thresholds
+    else:
+        packed_thresholds = _float32_floor(thresholds)
+        if threshold_dtype == "uint16":
+            # Lossless against float32: every node stores an index into the
+            # table of distinct thresholds
+            threshold_table, codes = np.unique(packed_thresholds, return_inverse=True)
+            if len(threshold_table) > np.iinfo(np.uint16).max + 1:
+                raise ValueError("Too many distinct thresholds for uint16 codes")
+            packed_thresholds = codes.astype(np.uint16)
+
+    value_scale = value_offset = None
+    if value_dtype in ("float64", "float32"):
+        packed_values = values.astype(value_dtype)
+    else:
+        levels = np.iinfo(value_dtype).max
+        value_offset = float(values.min())
+        value_scale = float(values.max() - value_offset) / levels or 1.0
+        packed_values = np.round((values - value_offset) / value_scale).astype(value_dtype)
+
+    return CompactForest(
+        roots=np.asarray(roots, dtype=np.int32),
+        feature=np.asarray(features, dtype=_smallest_uint(model.n_features_in_)),
+        left=np.asarray(lefts, dtype=np.int32),
+        thresholds=packed_thresholds,
+        values=packed_values,
+        depth=forest_depth,
+        n_features_in=model.n_features_in_,
+        threshold_table=threshold_table,
+        value_scale=value_scale,
+        value_offset=value_offset
+    )
+
+
+def out_of_bag_mask(model, n_rows):
+    """
+    Boolean (n_rows, n_trees) mask of the training rows each tree did not see.
+
+    Args:
+        model: Fitted forest with bootstrap sampling
+        n_rows (int): Number of rows the forest was fit on
+    """
+    if not getattr(model, 'bootstrap', False):
+        raise ValueError("Out-of-bag selection requires a forest fit with bootstrap=True")
+    oob = np.ones((n_rows, len(model.estimators_)), dtype=bool)
+    for i, samples in enumerate(model.estimators_samples_):
+        oob[samples, i] = False
+    return oob
+
+
+def select_n_estimators(model, X_train, y_train, tolerance=0.01, candidates=None):
+    """
+    Pick the smallest leading subset of trees whose out-of-bag RMSE stays
+    within ``tolerance`` (relative) of the full forest's.
+
+    Each row is predicted only by the trees that did not train on it, and a
+    subset is compared with the full forest on the rows it has such trees for.
+
+    Args:
+        model: Fitted forest with bootstrap sampling
+        X_train, y_train: The rows the forest was fit on, in fit order
+        tolerance (float): Allowed relative increase in RMSE
+        candidates (list): Tree counts to try, by default 1..n_estimators
+    """
+    compact = build_compact_forest(model, threshold_dtype="float64", value_dtype="float64")
+    per_tree = compact.leaf_values(compact.apply(X_train))
+    oob = out_of_bag_mask(model, len(per_tree))
+    y_train = np.asarray(y_train)
+
+    # Running out-of-bag mean over the leading trees, NaN where a row has none
+    counts = np.cumsum(oob, axis=1)
+    sums = np.cumsum(np.where(oob, per_tree, 0.0), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        running_mean = sums / counts
+    full = running_mean[:, -1]
+
+    n_trees = per_tree.shape[1]
+    if candidates is None:
+        candidates = range(1, n_trees + 1)
+    for n in sorted(candidates):
+        rows = (counts[:, n - 1] > 0) & (counts[:, -1] > 0)
+        if not rows.any():
+            continue
+        rmse = np.sqrt(np.mean((running_mean[rows, n - 1] - y_train[rows]) ** 2))
+        limit = np.sqrt(np.mean((full[rows] - y_train[rows]) ** 2)) * (1 + tolerance)
+        if rmse <= limit:
+            return int(n)
+    return n_trees
+
+
+_RSS_SCRIPT = """
+import pickle, sys, psutil, sklearn.ensemble, src.models.compress
+process = psutil.Process()
+before = process.memory_info().rss
+with open(sys.argv[1], 'rb') as f:
+    model = pickle.load(f)
+print(process.memory_info().rss - before)
+"""
+
+
+def _loaded_rss(artifact):
+    """Resident memory added by unpickling an artifact in a fresh interpreter"""
+    with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as f:
+        f.write(artifact)
+    try:
+        root = os.path.join(os.path.dirname(__file__), '..', '..')
+        output = subprocess.run(
+            [sys.executable, "-c", _RSS_SCRIPT, f.name],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        return max(int(output.strip().splitlines()[-1]), 0)
+    finally:
+        os.remove(f.name)
+
+
+def _predict_latency_ms(model, X, repeats=20):
+    """Median predict latency in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def _forest_nbytes(model):
+    return int(sum(
+        e.tree_.children_left.nbytes + e.tree_.children_right.nbytes
+        + e.tree_.feature.nbytes + e.tree_.threshold.nbytes + e.tree_.value.nbytes
+        for e in model.estimators_
+    ))
+
+
+def profile_model(model, X_val, y_val, reference_predictions=None):
+    """Measure size, memory, latency and accuracy of a model on validation data"""
+    artifact = pickle.dumps(model)
+    predictions = model.predict(X_val)
+    y_val = np.asarray(y_val)
+
+    report = {
+        "artifact_bytes": len(artifact),
+        "array_bytes": model.nbytes if isinstance(model, CompactForest) else _forest_nbytes(model),
+        "rss_bytes": _loaded_rss(artifact),
+        "latency_single_ms": _predict_latency_ms(model, X_val[:1]),
+        "latency_batch_ms": _predict_latency_ms(model, X_val),
+        "r2": float(r2_score(y_val, predictions)),
+        "mape": float(np.mean(np.abs((y_val - predictions) / y_val)) * 100)
+    }
+    if reference_predictions is not None:
+        report["max_abs_diff"] = float(np.max(np.abs(predictions - reference_predictions)))
+    return report
+
+
+@profile_stage("compress_model")
+def compress_model(model=None, X=None, y=None, tolerance=0.01, max_depth=None,
+                   merge_tol=0.0, threshold_dtype="uint16", value_dtype="float32"):
+    """
+    Compress the tuned model and report size/accuracy trade-offs.
+
+    The tree count is selected on out-of-bag predictions for the training
+    split of ``train_model``, and the operating points are evaluated against
+    the uncompressed forest on its held-out test split. Saves the chosen compact
+    artifact and writes the report to metrics/compression_report.json.
+
+    Returns:
+        dict: Compression report
+    """
+    with mlflow.start_run(run_name="model_compression"):
+        if X is None or y is None:
+            logger.info("Loading processed data...")
+            X = pd.read_csv("data/processed/features.csv")
+            y = pd.read_csv("data/processed/target.csv")['nilai']
+            y = y.fillna(y.mean())
+        record_rows(len(X))
+
+        # Same split as train_model, so X_train holds the fit rows in fit order
+        X_train, X_test, y_train, y_test = train_test_split(
+            np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64),
+            test_size=0.2, random_state=42
+        )
+
+        model_path = os.path.join(os.path.dirname(__file__), 'tuned_model.pkl')
+        if model is None:
+            logger.info(f"Loading model from {model_path}")
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+
+        n_estimators = select_n_estimators(
+            model, X_train, y_train, tolerance=tolerance,
+            candidates=[n for n in (10, 25, 50, 100, 150) if n < model.n_estimators] + [model.n_estimators]
+        )
+        logger.info(f"Selected {n_estimators} of {model.n_estimators} trees")
+
+        operating_points = {
+            "float32": dict(n_estimators=None, threshold_dtype="float32", value_dtype="float32"),
+            "selected_trees": dict(n_estimators=n_estimators, threshold_dtype="float32", value_dtype="float32"),
+            "depth_capped": dict(n_estimators=n_estimators, max_depth=None, threshold_dtype="float32", value_dtype="float32"),
+            "merged_leaves": dict(n_estimators=n_estimators, merge_tol=0.005, threshold_dtype="float32", value_dtype="float32"),
+            "quantized_uint16": dict(n_estimators=n_estimators, threshold_dtype="uint16", value_dtype="uint16"),
+            "quantized_uint8": dict(n_estimators=n_estimators, threshold_dtype="uint16", value_dtype="uint8"),
+            "chosen": dict(n_estimators=n_estimators, max_depth=max_depth, merge_tol=merge_tol,
+                           threshold_dtype=threshold_dtype, value_dtype=value_dtype)
+        }
+
+        full_depth = build_compact_forest(model, n_estimators=n_estimators).depth
+        operating_points["depth_capped"]["max_depth"] = max(full_depth - 2, 1)
+
+        reference = model.predict(X_test)
+        report = {"uncompressed": profile_model(model, X_test, y_test)}
+        compact_models = {}
+        for name, params in operating_points.items():
+            compact = build_compact_forest(model, **params)
+            compact_models[name] = compact
+            report[name] = profile_model(compact, X_test, y_test, reference)
+            report[name].update(
+                {k: v for k, v in params.items() if v is not None},
+                node_count=compact.node_count,
+                n_estimators=compact.n_estimators
+            )
+            logger.info(f"{name}: {report[name]}")
+
+        # Log the chosen operating point to MLflow
+        mlflow.log_param("compact_n_estimators", n_estimators)
+        mlflow.log_param("compact_max_depth", max_depth)
+        mlflow.log_param("compact_merge_tol", merge_tol)
+        mlflow.log_param("compact_threshold_dtype", threshold_dtype)
+        mlflow.log_param("compact_value_dtype", value_dtype)
+        for name in ("uncompressed", "chosen"):
+            for metric_name in ("artifact_bytes", "rss_bytes", "latency_single_ms", "r2", "mape"):
+                mlflow.log_metric(f"{name}_{metric_name}", report[name][metric_name])
+
+        # Save compact model locally
+        compact_path = os.path.join(os.path.dirname(__file__), 'compact_model.pkl')
+        with open(compact_path, 'wb') as f:
+            pickle.dump(compact_models["chosen"], f)
+
+        # Save report
+        metrics_dir = os.path.join(os.path.dirname(__file__), '..', 'metrics')
+        os.makedirs(metrics_dir, exist_ok=True)
+        report_path = os.path.join(metrics_dir, 'compression_report.json')
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        mlflow.log_artifact(report_path)
+
+        return report
+
+if __name__ == "__main__":
+    # Run through the package so the pickled CompactForest can be loaded by the API
+    from src.models.compress import compress_model as package_compress_model
+    package_compress_model()
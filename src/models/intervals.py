@@ -0,0 +1,68 @@
+import numpy as np
+from statistics import NormalDist
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+from src.api.schema import INTERVAL_TYPES
+from src.models.compress import CompactForest, build_compact_forest
+
+
+def as_compact_forest(model):
+    """
+    Return a CompactForest for a fitted single-output forest regressor, or
+    None for other models.
+
+    Only random and extra-trees regressors are packed: their trees see every
+    feature and predict the mean of the tree outputs, so the packed forest
+    matches model.predict. Bagging ensembles (per-estimator feature subsets)
+    and classifiers (class probabilities) are not.
+    """
+    if isinstance(model, CompactForest):
+        return model
+    if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)) and model.n_outputs_ == 1:
+        return build_compact_forest(model, threshold_dtype="float64", value_dtype="float64")
+    return None
+
+
+def predict_interval(forest, X, interval="quantile", level=0.9, batch_size=4096):
+    """
+    Predict with uncertainty bounds from the spread of the per-tree outputs.
+
+    All trees are traversed in one vectorized pass per batch of rows, and the
+    point prediction is the mean of the same per-tree values. The bounds
+    describe how much the trees disagree, not calibrated predictive
+    uncertainty: the share of targets they cover can be far below ``level``
+    (see interval_coverage from evaluate_models).
+
+    Args:
+        forest (CompactForest): Packed forest
+        X: Feature rows
+        interval (str): "quantile" for empirical quantiles of the tree outputs,
+            "std" for mean +/- z * standard deviation
+        level (float): Quantile level of the per-tree spread, between 0 and 1
+        batch_size (int): Rows per pass, bounding the (rows, trees) matrix
+
+    Returns:
+        tuple: (predictions, lower, upper) arrays
+    """
+    if interval not in INTERVAL_TYPES:
+        raise ValueError(f"interval must be one of {INTERVAL_TYPES}")
+    if not 0 < level < 1:
+        raise ValueError("level must be between 0 and 1")
+
+    X = np.asarray(X, dtype=np.float32)
+    if interval == "std":
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+    alpha = (1 - level) / 2
+
+    predictions, lower, upper = (np.empty(len(X)) for _ in range(3))
+    for start in range(0, len(X), batch_size):
+        rows = slice(start, start + batch_size)
+        per_tree = forest.leaf_values(forest.apply(X[rows]))
+        predictions[rows] = per_tree.mean(axis=1)
+
+        if interval == "quantile":
+            lower[rows], upper[rows] = np.quantile(per_tree, [alpha, 1 - alpha], axis=1)
+        else:
+            spread = z * per_tree.std(axis=1)
+            lower[rows], upper[rows] = predictions[rows] - spread, predictions[rows] + spread
+
+    return predictions, lower, upper
@@ -10,6 +10,7 @@ import pickle
 import os
 import json
 import logging
+from src.profiling.profiler import profile_stage, record_rows
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -50,8 +51,20 @@ def evaluate_model(model, X_test, y_test):
         'r2': float(r2)
     }
 
-def train_model():
-    """Train and evaluate different models for GK prediction"""
+@profile_stage("train_model")
+def train_model(model_dir=None, metrics_dir=None):
+    """
+    Train and evaluate different models for GK prediction.
+
+    Each model is saved as <name>_model.pkl in ``model_dir`` (default: this
+    package) and the metrics to all_metrics.json in ``metrics_dir``
+    (default: src/metrics).
+    """
+    if model_dir is None:
+        model_dir = os.path.dirname(__file__)
+    if metrics_dir is None:
+        metrics_dir = os.path.join(os.path.dirname(__file__), '..', 'metrics')
+    
     with mlflow.start_run(run_name="model_training"):
         # Load processed data
         logger.info("Loading processed data...")
@@ -66,6 +79,7 @@ def train_model():
         # Convert to numpy arrays
         X_array = X.values
         y_array = y['nilai'].values
+        record_rows(len(X_array))
         
         logger.info(f"Data loaded - X shape: {X_array.shape}, y shape: {y_array.shape}")
         
@@ -97,18 +111,20 @@ def train_model():
                 mlflow.log_metric(f"{name}_{metric_name}", value)
             
             # Log model
-            mlflow.sklearn.log_model(model, f"{name}_model")
+            mlflow.sklearn.log_model(
+                model, f"{name}_model",
+                serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE
+            )
             
             # Save model locally
-            model_dir = os.path.join(os.path.dirname(__file__), 'tuned_model.pkl')
-            os.makedirs(os.path.dirname(model_dir), exist_ok=True)
-            with open(model_dir, 'wb') as f:
+            model_path = os.path.join(model_dir, f'{name}_model.pkl')
+            os.makedirs(model_dir, exist_ok=True)
+            with open(model_path, 'wb') as f:
                 pickle.dump(model, f)
             
             logger.info(f"{name} model metrics: {metrics}")
         
         # Save metrics
-        metrics_dir = os.path.join(os.path.dirname(__file__), '..', 'metrics')
         os.makedirs(metrics_dir, exist_ok=True)
         with open(os.path.join(metrics_dir, 'all_metrics.json'), 'w') as f:
             json.dump(results, f, indent=2)
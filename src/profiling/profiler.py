@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+import mlflow
+from mlflow.tracking import MlflowClient
+import psutil
+import cProfile
+import pstats
+import tracemalloc
+import threading
+import functools
+import time
+import io
+import os
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Comma-separated detail tracers to enable: "cprofile", "tracemalloc" or "all"
+PROFILE_ENV = "GK_PROFILE"
+# Directory the stage reports are written to, read on every stage call
+METRICS_DIR_ENV = "GK_PROFILE_DIR"
+METRICS_DIR = "metrics"
+PROFILE_FILE = "stage_profile.json"
+HISTORY_FILE = "stage_profile_history.jsonl"
+
+# Records of the stages currently running, innermost last
+_active_stages = []
+
+
+def _enabled_tracers():
+    value = os.environ.get(PROFILE_ENV, "")
+    tracers = {t.strip().lower() for t in value.split(",") if t.strip()}
+    if "all" in tracers:
+        tracers = {"cprofile", "tracemalloc"}
+    return tracers
+
+
+class _PeakRSSSampler:
+    """Background thread that tracks the peak resident set size"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start = self.process.memory_info().rss
+        self.peak = self.start
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+def record_rows(n_rows):
+    """Record the number of rows processed by the running stage"""
+    if _active_stages:
+        _active_stages[-1]["rows"] = int(n_rows)
+
+
+def _infer_rows(result):
+    """Row count of a stage result: a frame/array or a tuple starting with one"""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return int(result.shape[0])
+    return None
+
+
+def _load_previous(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _compare(record, previous):
+    """Relative change of each measurement against the previous run of the stage"""
+    change = {}
+    for key in ("wall_time_s", "cpu_time_s", "peak_rss_delta_bytes", "rows"):
+        old, new = previous.get(key), record.get(key)
+        if old and new is not None:
+            change[key] = (new - old) / old
+    return change
+
+
+def _save(record, metrics_dir):
+    """Write the record next to the previous runs and return the report path"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    path = os.path.join(metrics_dir, PROFILE_FILE)
+    profiles = _load_previous(path)
+    previous = profiles.get(record["stage"])
+    if previous:
+        record["change_vs_previous"] = _compare(record, previous)
+
+    profiles[record["stage"]] = record
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=4)
+    with open(os.path.join(metrics_dir, HISTORY_FILE), "a") as f:
+        f.write(json.dumps(record) + "\n")
+    return path
+
+
+def _last_run_id():
+    """Id of the MLflow run that ended last in this process, or None"""
+    try:
+        run = mlflow.last_active_run()
+    except Exception:
+        return None
+    return run.info.run_id if run is not None else None
+
+
+def _log_to_mlflow(record, artifacts, run_id):
+    """Log the profile to the run the stage opened and closed"""
+    client = MlflowClient()
+    prefix = f"profile_{record['stage']}"
+    keys = ("wall_time_s", "cpu_time_s", "rss_start_bytes", "peak_rss_bytes",
+            "peak_rss_delta_bytes", "rows", "tracemalloc_peak_bytes")
+    for key in keys:
+        if record.get(key) is not None:
+            client.log_metric(run_id, f"{prefix}_{key}", record[key])
+    for artifact in artifacts:
+        client.log_artifact(run_id, artifact)
+
+
+def _summary(record):
+    parts = [
+        f"wall {record['wall_time_s']:.3f}s",
+        f"cpu {record['cpu_time_s']:.3f}s",
+        f"peak RSS {record['peak_rss_bytes'] / 2**20:.1f} MiB "
+        f"(+{record['peak_rss_delta_bytes'] / 2**20:.1f} MiB over start)",
+        f"rows {record['rows']}"
+    ]
+    change = record.get("change_vs_previous", {})
+    labels = ("wall_time_s", "cpu_time_s", "peak_rss_delta_bytes", "rows")
+    parts = [
+        f"{part} ({change[label]:+.1%})" if label in change else part
+        for part, label in zip(parts, labels)
+    ]
+    return ", ".join(parts)
+
+
+def profile_stage(stage, metrics_dir=None):
+    """
+    Decorator that profiles a pipeline stage.
+
+    Records wall time, CPU time, peak RSS and rows processed, writes them to
+    metrics/stage_profile.json (latest run per stage, with the change against
+    the previous run) and metrics/stage_profile_history.jsonl, and logs them
+    to the MLflow run the stage opens, if any. Peak RSS is reported both as
+    the absolute process value and as the growth over RSS at stage start,
+    which excludes memory held before the stage (imports, earlier stages)
+    and is the value compared between runs. Setting GK_PROFILE to
+    "cprofile", "tracemalloc" or "all" adds detailed tracing.
+
+    Args:
+        stage (str): Stage name used in the reports
+        metrics_dir (str): Directory the reports are written to, by default
+            GK_PROFILE_DIR or metrics/
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracers = _enabled_tracers()
+            out_dir = metrics_dir or os.environ.get(METRICS_DIR_ENV, METRICS_DIR)
+            record = {"stage": stage, "rows": None}
+            _active_stages.append(record)
+            run_before = _last_run_id()
+
+            profiler = cProfile.Profile() if "cprofile" in tracers else None
+            start_tracemalloc = "tracemalloc" in tracers and not tracemalloc.is_tracing()
+            if start_tracemalloc:
+                tracemalloc.start()
+            if "tracemalloc" in tracers and hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+
+            try:
+                with _PeakRSSSampler() as sampler:
+                    wall_start = time.perf_counter()
+                    cpu_start = time.process_time()
+                    if profiler is not None:
+                        profiler.enable()
+                    try:
+                        result = func(*args, **kwargs)
+                    finally:
+                        if profiler is not None:
+                            profiler.disable()
+                    cpu_time = time.process_time() - cpu_start
+                    wall_time = time.perf_counter() - wall_start
+            finally:
+                _active_stages.pop()
+                if "tracemalloc" in tracers:
+                    record["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                if start_tracemalloc:
+                    tracemalloc.stop()
+
+            if record["rows"] is None:
+                record["rows"] = _infer_rows(result)
+            record.update(
+                wall_time_s=wall_time,
+                cpu_time_s=cpu_time,
+                rss_start_bytes=sampler.start,
+                peak_rss_bytes=sampler.peak,
+                peak_rss_delta_bytes=sampler.peak - sampler.start,
+                timestamp=time.time()
+            )
+
+            artifacts = [_save(record, out_dir)]
+            if profiler is not None:
+                prof_path = os.path.join(out_dir, f"profile_{stage}.prof")
+                profiler.dump_stats(prof_path)
+                stats_path = os.path.join(out_dir, f"profile_{stage}.txt")
+                stream = io.StringIO()
+                pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(30)
+                with open(stats_path, "w") as f:
+                    f.write(stream.getvalue())
+                artifacts += [prof_path, stats_path]
+
+            # Only log to a run the stage itself ended, never to an older one
+            run_id = _last_run_id()
+            if run_id is not None and run_id != run_before:
+                try:
+                    _log_to_mlflow(record, artifacts, run_id)
+                except Exception as e:
+                    logger.warning(f"Could not log {stage} profile to MLflow: {str(e)}")
+
+            logger.info(f"Stage {stage}: {_summary(record)}")
+            return result
+        return wrapper
+    return decorator
@@ -1,6 +1,11 @@
 import pytest
 import json
+import numpy as np
+import src.api.app as app_module
 from src.api.app import app
+from src.api.schema import compile_schema
+from src.models.compress import CompactForest
+from src.models.train import create_default_model
 
 @pytest.fixture
 def client():
@@ -48,4 +53,94 @@ def test_metadata_endpoint(client):
     assert 'features' in data
     assert 'version' in data
     assert isinstance(data['features'], list)
-    assert len(data['features']) > 0 
\ No newline at end of file
+    assert len(data['features']) > 0 
+
+class StubModel:
+    """Model that predicts the sum of the features"""
+
+    def predict(self, X):
+        return np.asarray(X).sum(axis=1)
+
+@pytest.fixture
+def stub_client(client, monkeypatch):
+    """Test client serving the stub model"""
+    monkeypatch.setattr(app_module, 'model', StubModel())
+    monkeypatch.setattr(app_module, 'feature_schema', compile_schema())
+    return client
+
+@pytest.fixture
+def valid_features():
+    """Valid feature values for the default schema"""
+    return {
+        "year_num": 5,
+        "periode_num": 1,
+        "jenis_NONMAKANAN": 0,
+        "jenis_TOTAL": 0,
+        "daerah_PERDESAANPERKOTAAN": 0,
+        "daerah_PERKOTAAN": 1
+    }
+
+def test_predict_endpoint_schema_errors(stub_client, valid_features):
+    """Test if schema errors return 400 and valid input a prediction"""
+    response = stub_client.post('/predict', json={"features": valid_features})
+    assert response.status_code == 200
+    assert json.loads(response.data) == {"prediction": 7.0, "status": "success"}
+
+    bad_bodies = [
+        b"{not json",
+        json.dumps({"invalid": "input"}).encode(),
+        json.dumps({"features": {"year_num": 5}}).encode(),
+        json.dumps({"features": dict(valid_features, periode_num=0.5)}).encode(),
+        json.dumps({"features": dict(valid_features, year_num="5")}).encode()
+    ]
+    for body in bad_bodies:
+        response = stub_client.post('/predict', data=body, content_type='application/json')
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data["status"] == "error"
+        assert data["error"]
+
+@pytest.fixture
+def forest_client(client, monkeypatch, fitted_forest):
+    """Test client serving a small fitted forest, with no packed copy yet"""
+    model, _, _ = fitted_forest
+    monkeypatch.setattr(app_module, 'model', model)
+    monkeypatch.setattr(app_module, 'feature_schema', compile_schema())
+    monkeypatch.setattr(app_module, 'forest', None)
+    return client
+
+def test_predict_endpoint_interval(forest_client, fitted_forest, valid_features):
+    """Test if intervals are served from a forest packed on the first interval request"""
+    model, _, _ = fitted_forest
+    expected = model.predict(np.array([list(valid_features.values())], dtype=float))[0]
+
+    response = forest_client.post('/predict', json={"features": valid_features})
+    assert response.status_code == 200
+    assert app_module.forest is None
+
+    response = forest_client.post('/predict?interval=std&level=0.8', json={"features": valid_features})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert isinstance(app_module.forest, CompactForest)
+    assert data["prediction"] == pytest.approx(expected)
+    interval = data["interval"]
+    assert set(interval) == {"type", "level", "calibrated", "lower", "upper"}
+    assert interval["type"] == "std"
+    assert interval["level"] == 0.8
+    assert interval["calibrated"] is False
+    assert interval["lower"] <= data["prediction"] <= interval["upper"]
+
+def test_predict_endpoint_interval_errors(forest_client, monkeypatch, fitted_forest, valid_features):
+    """Test if bad interval options and non-forest models return 400"""
+    for query in ('interval=bootstrap', 'interval=quantile&level=1.5', 'interval=quantile&level=high'):
+        response = forest_client.post(f'/predict?{query}', json={"features": valid_features})
+        assert response.status_code == 400
+        assert json.loads(response.data)["status"] == "error"
+
+    _, X, y = fitted_forest
+    monkeypatch.setattr(app_module, 'model', create_default_model().fit(X, y))
+    response = forest_client.post('/predict?interval=quantile', json={"features": valid_features})
+    assert response.status_code == 400
+    assert "tree ensemble" in json.loads(response.data)["error"]
+    response = forest_client.post('/predict', json={"features": valid_features})
+    assert response.status_code == 200
@@ -0,0 +1,59 @@
+import pytest
+import json
+import numpy as np
+from src.api.schema import SchemaError, compile_schema, FEATURE_RANGES
+
+@pytest.fixture
+def features():
+    """Valid feature values in request order"""
+    return {
+        "year_num": 5,
+        "periode_num": 1,
+        "jenis_NONMAKANAN": 0,
+        "jenis_TOTAL": 0,
+        "daerah_PERDESAANPERKOTAAN": 0,
+        "daerah_PERKOTAAN": 1
+    }
+
+def test_schema_parse(features):
+    """Test if a valid body is written into the feature row in column order"""
+    schema = compile_schema()
+    body = json.dumps({"features": dict(reversed(list(features.items())))})
+    row = schema.parse(body.encode())
+    assert row.shape == (1, len(FEATURE_RANGES))
+    np.testing.assert_array_equal(row[0], [features[name] for name in schema.names])
+
+def test_schema_invalid_input(features):
+    """Test if invalid bodies raise clear schema errors"""
+    schema = compile_schema()
+    with pytest.raises(SchemaError, match="Invalid JSON"):
+        schema.parse(b"{not json")
+    with pytest.raises(SchemaError, match="Expected 'features' object"):
+        schema.parse(b'{"invalid": "input"}')
+    with pytest.raises(SchemaError, match="Missing required features"):
+        schema.parse(json.dumps({"features": {"year_num": 5}}).encode())
+    with pytest.raises(SchemaError, match="Unknown features"):
+        schema.parse(json.dumps({"features": dict(features, extra=1)}).encode())
+
+def test_schema_type_and_range_errors(features):
+    """Test if wrong types and out-of-range values are rejected"""
+    schema = compile_schema()
+    for value in ("5", None, True, [5]):
+        body = json.dumps({"features": dict(features, year_num=value)}).encode()
+        with pytest.raises(SchemaError, match="'year_num' must be a number"):
+            schema.parse(body)
+    body = json.dumps({"features": dict(features, year_num=101)}).encode()
+    with pytest.raises(SchemaError, match="'year_num' must be between 0 and 100"):
+        schema.parse(body)
+    for value in (2, 0.5, -1):
+        body = json.dumps({"features": dict(features, periode_num=value)}).encode()
+        with pytest.raises(SchemaError, match="'periode_num' must be 0 or 1"):
+            schema.parse(body)
+    body = json.dumps({"features": dict(features, periode_num=1.0, year_num=5.5)}).encode()
+    assert schema.parse(body)[0, 1] == 1
+
+def test_schema_unknown_model_features():
+    """Test if model features without a known range fail with a clear error"""
+    model = type("Model", (), {"feature_names_in_": np.array(["year_num", "provinsi_ACEH"])})()
+    with pytest.raises(ValueError, match="No range defined for model features: \\['provinsi_ACEH'\\]"):
+        compile_schema(model)
@@ -1,6 +1,13 @@
 import pytest
 import pandas as pd
 import numpy as np
+from src.models.train import create_tuned_model
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    """Write stage profiles of tests to a temporary directory, not metrics/"""
+    monkeypatch.setenv("GK_PROFILE_DIR", str(tmp_path / "metrics"))
+    return tmp_path / "metrics"
 
 @pytest.fixture
 def sample_data():
@@ -45,4 +52,15 @@ def model_input():
             "daerah_PERKOTAAN": 1,
             "daerah_PERDESAANPERKOTAAN": 0
         }
-    } 
\ No newline at end of file
+    }
+
+@pytest.fixture
+def fitted_forest():
+    """Fit a small tuned forest on synthetic GK-like data"""
+    rng = np.random.RandomState(0)
+    X = np.column_stack([rng.randint(0, 10, 300), rng.randint(0, 2, (300, 5))]).astype(float)
+    y = 300000 + 20000 * X[:, 0] + 50000 * X[:, 2] + rng.normal(0, 1000, 300)
+    model = create_tuned_model()
+    model.set_params(n_estimators=20)
+    model.fit(X, y)
+    return model, X, y
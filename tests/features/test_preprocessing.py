@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from src.features.preprocessing import preprocess_data
+from src.features.preprocessing import preprocess_data, transform_features
 
 def test_preprocessing_output_shape(sample_data):
     """Test if preprocessing returns correct shapes"""
@@ -26,4 +26,30 @@ def test_preprocessing_no_nulls(sample_data):
 def test_preprocessing_target_range(sample_data):
     """Test if target values are in expected range"""
     _, y = preprocess_data(sample_data)
-    assert (y >= 0).all()  # GK values should be positive 
\ No newline at end of file
+    assert (y >= 0).all()  # GK values should be positive 
+
+def test_compact_preprocessing_equivalent(sample_data):
+    """Test if the compact path matches the default path without mutating input"""
+    original = sample_data.copy()
+    X_compact, y_compact, features_compact = transform_features(sample_data, compact=True)
+    pd.testing.assert_frame_equal(sample_data, original)
+
+    X, y, features = transform_features(sample_data.copy())
+    assert features_compact == features
+    assert X_compact.dtype == np.float32
+    np.testing.assert_allclose(X_compact, X, rtol=1e-6, atol=1e-6)
+    np.testing.assert_array_equal(y_compact, y)
+
+def test_compact_preprocessing_categorical_input(sample_data):
+    """Test if unsorted categorical keys give the same one-hot columns"""
+    categorical = sample_data.copy()
+    for col in ('jenis', 'daerah', 'periode'):
+        categories = list(reversed(sorted(categorical[col].unique())))
+        categorical[col] = pd.Categorical(categorical[col], categories=categories)
+    categorical.loc[0, 'nilai'] = np.nan
+
+    X_compact, y_compact, features_compact = transform_features(categorical, compact=True)
+    X, y, features = transform_features(categorical.astype({'jenis': object, 'daerah': object, 'periode': object}))
+    assert features_compact == features
+    np.testing.assert_allclose(X_compact, X, rtol=1e-6, atol=1e-6)
+    np.testing.assert_array_equal(y_compact, y)
@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from src.models.compress import build_compact_forest, select_n_estimators, out_of_bag_mask
+
+def test_compact_forest_matches_model(fitted_forest):
+    """Test if packing without pruning keeps predictions"""
+    model, X, _ = fitted_forest
+    for threshold_dtype in ("float64", "float32", "uint16"):
+        compact = build_compact_forest(model, threshold_dtype=threshold_dtype, value_dtype="float64")
+        np.testing.assert_allclose(compact.predict(X), model.predict(X), rtol=1e-9)
+
+def test_compact_forest_quantized_values(fitted_forest):
+    """Test if quantized leaf values stay close to the model"""
+    model, X, y = fitted_forest
+    compact = build_compact_forest(model, value_dtype="uint16")
+    assert compact.values.dtype == np.uint16
+    step = (y.max() - y.min()) / np.iinfo(np.uint16).max
+    assert np.max(np.abs(compact.predict(X) - model.predict(X))) <= step
+
+def test_compact_forest_pruning(fitted_forest):
+    """Test if depth capping, leaf merging and tree selection shrink the forest"""
+    model, X, y = fitted_forest
+    full = build_compact_forest(model)
+    capped = build_compact_forest(model, max_depth=3)
+    merged = build_compact_forest(model, merge_tol=0.05)
+    assert capped.depth <= 3
+    assert capped.node_count < full.node_count
+    assert merged.node_count < full.node_count
+    assert build_compact_forest(model, n_estimators=5).n_estimators == 5
+    assert 1 <= select_n_estimators(model, X, y, tolerance=0.05) <= model.n_estimators
+
+def test_tree_selection_out_of_bag(fitted_forest):
+    """Test if tree selection scores each tree only on rows it did not train on"""
+    model, X, y = fitted_forest
+    oob = out_of_bag_mask(model, len(X))
+    for i, samples in enumerate(model.estimators_samples_):
+        assert not oob[samples, i].any()
+        assert oob[:, i].sum() == len(X) - len(np.unique(samples))
+
+    model.set_params(bootstrap=False)
+    with pytest.raises(ValueError, match="bootstrap=True"):
+        select_n_estimators(model, X, y)
@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+from sklearn.ensemble import BaggingRegressor, ExtraTreesRegressor, RandomForestClassifier
+from src.models.train import create_default_model
+from src.models.intervals import as_compact_forest, predict_interval
+
+def test_interval_prediction_matches_model(fitted_forest):
+    """Test if the interval pass returns the model's point prediction"""
+    model, X, _ = fitted_forest
+    forest = as_compact_forest(model)
+    for interval in ("quantile", "std"):
+        predictions, lower, upper = predict_interval(forest, X, interval)
+        np.testing.assert_allclose(predictions, model.predict(X), rtol=1e-9)
+        assert np.all(lower <= upper)
+
+def test_interval_width_grows_with_level(fitted_forest):
+    """Test if a higher level gives wider intervals"""
+    model, X, _ = fitted_forest
+    forest = as_compact_forest(model)
+    for interval in ("quantile", "std"):
+        _, lower_50, upper_50 = predict_interval(forest, X, interval, level=0.5)
+        _, lower_95, upper_95 = predict_interval(forest, X, interval, level=0.95)
+        assert np.all(upper_95 - lower_95 >= upper_50 - lower_50)
+
+def test_interval_invalid_options(fitted_forest):
+    """Test if non-forest models and bad options are rejected"""
+    model, X, y = fitted_forest
+    assert as_compact_forest(create_default_model().fit(X, y)) is None
+    forest = as_compact_forest(model)
+    with pytest.raises(ValueError):
+        predict_interval(forest, X, "bootstrap")
+    with pytest.raises(ValueError):
+        predict_interval(forest, X, level=1.5)
+
+def test_interval_forest_types(fitted_forest):
+    """Test if only forest regressors are packed for intervals"""
+    _, X, y = fitted_forest
+    extra = ExtraTreesRegressor(n_estimators=5, random_state=0).fit(X, y)
+    np.testing.assert_allclose(as_compact_forest(extra).predict(X), extra.predict(X), rtol=1e-9)
+    bagging = BaggingRegressor(max_features=0.75, n_estimators=5, random_state=0).fit(X, y)
+    assert as_compact_forest(bagging) is None
+    classifier = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, X[:, 2])
+    assert as_compact_forest(classifier) is None
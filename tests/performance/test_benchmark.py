@@ -0,0 +1,28 @@
+import numpy as np
+from benchmarks.synthetic import make_wide_gk
+from benchmarks.bench_pipeline import compare
+from src.data.load_data import load_data
+
+def test_synthetic_wide_data_loads(tmp_path, monkeypatch):
+    """Test if synthetic gk.csv-shaped data goes through load_data"""
+    monkeypatch.chdir(tmp_path)
+    make_wide_gk(scale=2).to_csv("gk.csv", index=False)
+    X, y = load_data("gk.csv")
+    assert len(X) == len(y) == 70 * 156
+    assert 'jenis_NONMAKANAN' in X.columns
+    assert 'daerah_PERKOTAAN' in X.columns
+    assert set(X['periode_num']) == {0, 1}
+    assert np.isnan(y).mean() < 0.05
+
+def test_benchmark_flags_regressions():
+    """Test if only measurements past the tolerance are flagged"""
+    stage = {'wall_time_s': 10.0, 'cpu_time_s': 9.0, 'peak_rss_bytes': 400 * 2**20,
+             'peak_rss_delta_bytes': 100 * 2**20, 'rows': 100}
+    baseline = {'scales': {'1': {'train_model': stage}}}
+    slower = dict(stage, wall_time_s=14.0, peak_rss_bytes=800 * 2**20)
+    assert compare({'scales': {'1': {'train_model': slower}}}, baseline) == []
+
+    slower = dict(stage, wall_time_s=20.0, peak_rss_delta_bytes=200 * 2**20)
+    regressions = compare({'scales': {'1': {'train_model': slower}}}, baseline)
+    assert [r[2] for r in regressions] == ['wall_time_s', 'peak_rss_delta_bytes']
+    assert compare({'scales': {'10': {'train_model': slower}}}, baseline) == []
@@ -0,0 +1,85 @@
+import json
+import pytest
+import numpy as np
+import mlflow
+from src.profiling.profiler import profile_stage, record_rows, PROFILE_FILE, HISTORY_FILE
+
+@pytest.fixture(autouse=True)
+def tracking_uri(tmp_path, monkeypatch):
+    """Keep MLflow runs and artifacts of the tests in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", f"sqlite:///{tmp_path / 'mlflow.db'}")
+
+def test_profile_stage_records(tmp_path):
+    """Test if a stage profile is written with time, memory and rows"""
+    @profile_stage("sample", metrics_dir=str(tmp_path))
+    def stage():
+        return np.ones((50, 3)), np.ones(50)
+
+    X, _ = stage()
+    assert X.shape == (50, 3)
+    with open(tmp_path / PROFILE_FILE) as f:
+        record = json.load(f)["sample"]
+    assert record["rows"] == 50
+    assert record["wall_time_s"] >= 0
+    assert record["cpu_time_s"] >= 0
+    assert record["peak_rss_bytes"] > 0
+    assert record["peak_rss_delta_bytes"] == record["peak_rss_bytes"] - record["rss_start_bytes"]
+
+def test_profile_stage_trend(tmp_path):
+    """Test if repeated runs are compared against the previous run"""
+    @profile_stage("sample", metrics_dir=str(tmp_path))
+    def stage(n_rows):
+        record_rows(n_rows)
+        return {"n_rows": n_rows}
+
+    stage(100)
+    stage(200)
+    with open(tmp_path / PROFILE_FILE) as f:
+        record = json.load(f)["sample"]
+    assert record["rows"] == 200
+    assert record["change_vs_previous"]["rows"] == 1.0
+    assert len((tmp_path / HISTORY_FILE).read_text().splitlines()) == 2
+
+def test_profile_stage_detailed_tracing(tmp_path, monkeypatch):
+    """Test if cProfile and tracemalloc tracing can be switched on"""
+    monkeypatch.setenv("GK_PROFILE", "all")
+
+    @profile_stage("sample", metrics_dir=str(tmp_path))
+    def stage():
+        return [0] * 100000
+
+    stage()
+    with open(tmp_path / PROFILE_FILE) as f:
+        record = json.load(f)["sample"]
+    assert record["tracemalloc_peak_bytes"] > 0
+    assert (tmp_path / "profile_sample.prof").exists()
+    assert (tmp_path / "profile_sample.txt").exists()
+
+def test_profile_stage_logs_to_own_run(tmp_path):
+    """Test if metrics go to the run the stage opened and never to an older run"""
+    @profile_stage("sample", metrics_dir=str(tmp_path))
+    def stage_with_run():
+        with mlflow.start_run(run_name="sample"):
+            return np.ones(10)
+
+    @profile_stage("other", metrics_dir=str(tmp_path))
+    def stage_without_run():
+        return np.ones(10)
+
+    stage_with_run()
+    stage_without_run()
+    metrics = mlflow.get_run(mlflow.last_active_run().info.run_id).data.metrics
+    assert metrics["profile_sample_rows"] == 10
+    assert "profile_sample_peak_rss_delta_bytes" in metrics
+    assert not any(key.startswith("profile_other") for key in metrics)
+
+def test_profile_stage_directory_from_env(profile_dir):
+    """Test if stages without a metrics_dir write to GK_PROFILE_DIR"""
+    @profile_stage("sample")
+    def stage():
+        return np.ones(5)
+
+    stage()
+    with open(profile_dir / PROFILE_FILE) as f:
+        assert json.load(f)["sample"]["rows"] == 5